@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+akshare / 东财接口的本地磁盘 TTL 缓存，按数据更新频率设置过期时间。
+缓存目录默认 ~/.tas-cache，可用环境变量 TAS_CACHE_DIR 覆盖；TAS_CACHE_DISABLE=1 时关闭缓存。
+文件布局：<root>/<endpoint>/<md5(key)>.pkl，内容为 (value, expires_at)。
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, Callable, Optional
+
+# 财报季度更新，行情快照盘中变化，新闻需及时刷新
+TTL_STATEMENT = 90 * 86400
+TTL_SPOT = 3600
+TTL_NEWS = 1800
+
+# 写入中途被中断（如 worker 超时被杀）会残留临时文件，超过该时长视为废弃
+STALE_TMP_SECONDS = 600
+
+_MISS = object()
+
+
+def _remove_stale_tmp(directory: str) -> None:
+    cutoff = time.time() - STALE_TMP_SECONDS
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            if not entry.name.endswith(".tmp"):
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None:
+        return True
+    empty = getattr(value, "empty", None)
+    return bool(empty) if isinstance(empty, bool) else False
+
+
+class FileCache:
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = root or os.environ.get("TAS_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".tas-cache")
+        self.disabled = os.environ.get("TAS_CACHE_DISABLE") == "1"
+
+    def _path(self, endpoint: str, key: str) -> str:
+        digest = hashlib.md5(str(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.root, endpoint, f"{digest}.pkl")
+
+    def get(self, endpoint: str, key: str) -> Any:
+        """命中且未过期返回缓存值，否则返回 _MISS"""
+        path = self._path(endpoint, key)
+        try:
+            with open(path, "rb") as f:
+                value, expires_at = pickle.load(f)
+        except Exception:
+            return _MISS
+        if expires_at < time.time():
+            return _MISS
+        return value
+
+    def set(self, endpoint: str, key: str, value: Any, ttl: float) -> None:
+        path = self._path(endpoint, key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        _remove_stale_tmp(directory)
+        # 先写临时文件再 os.replace 原子替换：读方只会看到旧文件或完整的新文件，无需加锁；
+        # 并发写入时以最后完成的一次为准
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((value, time.time() + ttl), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def get_or_fetch(self, endpoint: str, key: str, ttl: float, fetch: Callable[[], Any]) -> Any:
+        """缓存读写失败不影响主流程；空结果不落盘，避免缓存住临时故障"""
+        if self.disabled:
+            return fetch()
+        value = self.get(endpoint, key)
+        if value is not _MISS:
+            return value
+        value = fetch()
+        if not _is_empty(value):
+            try:
+                self.set(endpoint, key, value, ttl)
+            except Exception:
+                pass
+        return value
+
+
+_DEFAULT_CACHE = FileCache()
+
+
+def get_or_fetch(endpoint: str, key: str, ttl: float, fetch: Callable[[], Any]) -> Any:
+    return _DEFAULT_CACHE.get_or_fetch(endpoint, key, ttl, fetch)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+py-bridge 统一 JSON 读写：优先使用 orjson（直接处理 UTF-8 bytes），未安装时回退标准库 json。
+"""
+import json
+import sys
+from typing import Any
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    return dumps_bytes(obj, indent=indent).decode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """data 可为 bytes 或 str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read_stdin() -> Any:
+    """直接读取 stdin 字节流解析，省去解码为 str 的一步；空输入返回 {}"""
+    raw = sys.stdin.buffer.read()
+    return loads(raw) if raw.strip() else {}
+
+
+def emit(obj: Any) -> None:
+    """序列化后直接写 stdout 字节流，省去 str 再编码的一步"""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(dumps_bytes(obj))
+    sys.stdout.buffer.write(b"\n")
+    sys.stdout.buffer.flush()
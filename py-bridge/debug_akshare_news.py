@@ -6,7 +6,8 @@ python debug_akshare_news.py 600519 10
 """
 
 import sys
-import json
+
+from _jsonio import dumps
 
 def main():
     if len(sys.argv) < 2:
@@ -36,8 +37,7 @@ def main():
     cols = df.columns.tolist()
     print(f"字段: {cols}")
     preview = []
-    for _, row in df.head(max_news).iterrows():
-        d = row.to_dict()
+    for d in df.head(max_news).to_dict("records"):
         preview.append(
             {
                 "title": d.get("title") or d.get("art_title") or d.get("digest"),
@@ -45,7 +45,7 @@ def main():
                 "time": d.get("publish_time") or d.get("datetime") or d.get("showtime"),
             }
         )
-    print(json.dumps(preview, ensure_ascii=False, indent=2))
+    print(dumps(preview, indent=True))
 
 if __name__ == "__main__":
     main()
@@ -5,15 +5,27 @@
 输入：stdin JSON {"symbol": "600519"}
 输出：{"pe": number, "pb": number, "roe": number, "growth": number, "net_margin": number, "gross_margin": number, "market_cap": number}
 """
-import json
+import functools
+import re
 import sys
-from typing import Any, Dict, Optional, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, List, Pattern, Tuple
+
+from _cache import TTL_SPOT, TTL_STATEMENT, get_or_fetch
+from _jsonio import emit, read_stdin
 
 
 def safe_float(val: Any) -> Optional[float]:
+    # 常见的 float/int 直接返回，跳过 try 与类型转换
+    t = type(val)
+    if t is float:
+        return None if val != val else val
+    if t is int:
+        return float(val)
+    if val is None:
+        return None
     try:
-        if val is None:
-            return None
         f = float(val)
         if f != f:  # NaN 检查
             return None
@@ -22,25 +34,41 @@ def safe_float(val: Any) -> Optional[float]:
         return None
 
 
+# 支持多种字段命名，优先净利润、其次营收；外加通用的同比/增长/yoy 字样
+_GROWTH_KEYWORDS = [
+    "净利润同比增长",
+    "净利润同比增长率",
+    "归母净利润同比增长",
+    "归母净利润同比增长率",
+    "净利润增长率",
+    "净利润同比",
+    "营业收入同比增长",
+    "营业收入同比增长率",
+    "营业收入增长率",
+    "营收同比",
+    "同比",
+    "增长",
+    "yoy",
+]
+_GROWTH_RE = re.compile("|".join(re.escape(k) for k in _GROWTH_KEYWORDS), re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_keywords(keywords: Tuple[str, ...]) -> Pattern[str]:
+    return re.compile("|".join(re.escape(k) for k in keywords), re.IGNORECASE)
+
+
+def keyword_pattern(keywords) -> Pattern[str]:
+    """关键字列表编译为单个不区分大小写的正则，相同关键字组合只编译一次"""
+    if isinstance(keywords, re.Pattern):
+        return keywords
+    return _compile_keywords(tuple(keywords))
+
+
 def parse_growth(latest: Dict[str, Any]) -> Optional[float]:
-    # 支持多种字段命名，优先净利润、其次营收
-    candidates = [
-        "净利润同比增长",
-        "净利润同比增长率",
-        "归母净利润同比增长",
-        "归母净利润同比增长率",
-        "净利润增长率",
-        "净利润同比",
-        "营业收入同比增长",
-        "营业收入同比增长率",
-        "营业收入增长率",
-        "营收同比",
-    ]
-    # 直接遍历字段模糊匹配
-    for key, raw in latest.items():
-        name = str(key)
-        lower_name = name.lower()
-        if any(kw in name for kw in candidates) or "同比" in name or "增长" in name or "yoy" in lower_name:
+    # 直接遍历字段模糊匹配，单次正则扫描代替逐个关键字 in 判断
+    for name, raw in latest.items():
+        if _GROWTH_RE.search(str(name)):
             val = safe_float(raw)
             if val is None:
                 continue
@@ -49,70 +77,90 @@ def parse_growth(latest: Dict[str, Any]) -> Optional[float]:
 
 
 def pick_by_keywords(latest: Dict[str, Any], keywords) -> Optional[float]:
-    for key, raw in latest.items():
-        name = str(key)
-        lower_name = name.lower()
-        if any(kw.lower() in lower_name for kw in keywords):
+    """keywords 可为关键字列表或 keyword_pattern 预编译的正则"""
+    pattern = keyword_pattern(keywords)
+    for name, raw in latest.items():
+        if pattern.search(str(name)):
             val = safe_float(raw)
             if val is not None:
                 return val
     return None
 
 
-def fill_from_spot(symbol: str, result: Dict[str, Any]) -> None:
-    """从行情快照补齐 PE/PB/市值（akshare stock_zh_a_spot_em）"""
+@functools.lru_cache(maxsize=1)
+def _load_spot_index(bucket: int):
+    import akshare as ak  # type: ignore
+
+    df_spot = get_or_fetch("zh_a_spot_em", "all", TTL_SPOT, ak.stock_zh_a_spot_em)
+    if df_spot is None or df_spot.empty:
+        return None
+    return df_spot.drop_duplicates("代码").set_index("代码", drop=False)
+
+
+def load_spot_index():
+    """全市场行情快照按代码建索引，按 TTL_SPOT 分桶缓存，常驻进程中也会定期刷新"""
+    return _load_spot_index(int(time.time() // TTL_SPOT))
+
+
+def fill_from_spot_table(symbol: str, result: Dict[str, Any]) -> None:
+    """单只行情不可用时，从 akshare stock_zh_a_spot_em 快照补齐 PE/PB/市值"""
+    spot_idx = load_spot_index()
+    if spot_idx is None:
+        return
     try:
-        import akshare as ak  # type: ignore
+        rec = spot_idx.loc[symbol].to_dict()
+    except KeyError:
+        return
+    pe_candidates = ["市盈率-动态", "市盈率(动态)", "市盈率"]
+    pb_candidates = ["市净率"]
+    mv_candidates = ["总市值", "总市值(亿元)"]
+
+    for col in pe_candidates:
+        if col in rec and result.get("pe") == 0:
+            val = safe_float(rec[col])
+            if val is not None:
+                result["pe"] = val
+                break
+
+    for col in pb_candidates:
+        if col in rec and result.get("pb") == 0:
+            val = safe_float(rec[col])
+            if val is not None:
+                result["pb"] = val
+                break
+
+    for col in mv_candidates:
+        if col in rec and result.get("market_cap") == 0:
+            val = safe_float(rec[col])
+            if val is not None:
+                # stock_zh_a_spot_em 总市值单位：亿元
+                result["market_cap"] = val * 10000
+                break
 
-        df_spot = ak.stock_zh_a_spot_em()
-        if df_spot is None or df_spot.empty:
-            return
-        row = df_spot[df_spot["代码"] == symbol]
-        if row is None or row.empty:
-            return
-        rec = row.iloc[0]
-        pe_candidates = ["市盈率-动态", "市盈率(动态)", "市盈率"]
-        pb_candidates = ["市净率"]
-        mv_candidates = ["总市值", "总市值(亿元)"]
-
-        for col in pe_candidates:
-            if col in rec and result.get("pe") == 0:
-                val = safe_float(rec[col])
-                if val is not None:
-                    result["pe"] = val
-                    break
-
-        for col in pb_candidates:
-            if col in rec and result.get("pb") == 0:
-                val = safe_float(rec[col])
-                if val is not None:
-                    result["pb"] = val
-                    break
-
-        for col in mv_candidates:
-            if col in rec and result.get("market_cap") == 0:
-                val = safe_float(rec[col])
-                if val is not None:
-                    # stock_zh_a_spot_em 总市值单位：亿元
-                    result["market_cap"] = val * 10000
-                    break
+
+def fill_from_spot(symbol: str, result: Dict[str, Any]) -> None:
+    """
+    用东财单只股票行情补齐 PE/PB/市值。
+    仅当行情请求本身失败（异常或无 data）时才退回全市场快照；个别字段缺失（如 f162 为 "-"）
+    时快照里通常同样缺失，不再为此下载整张表。
+    """
+    try:
+        quote = fetch_quote_from_eastmoney(symbol)
     except Exception:
-        # 忽略 akshare 失败，稍后走 HTTP 兜底
-        pass
+        quote = None
+    if quote is not None:
+        if result.get("pe") == 0 and quote.get("pe") is not None:
+            result["pe"] = quote["pe"]
+        if result.get("pb") == 0 and quote.get("pb") is not None:
+            result["pb"] = quote["pb"]
+        if result.get("market_cap") == 0 and quote.get("market_cap") is not None:
+            result["market_cap"] = quote["market_cap"]
+        return
 
-    # 若仍缺，直接调用东财行情接口兜底
-    if (result.get("pe") == 0 or result.get("pb") == 0 or result.get("market_cap") == 0):
-        try:
-            quote = fetch_quote_from_eastmoney(symbol)
-            if quote:
-                if result.get("pe") == 0 and quote.get("pe") is not None:
-                    result["pe"] = quote["pe"]
-                if result.get("pb") == 0 and quote.get("pb") is not None:
-                    result["pb"] = quote["pb"]
-                if result.get("market_cap") == 0 and quote.get("market_cap") is not None:
-                    result["market_cap"] = quote["market_cap"]
-        except Exception:
-            return
+    try:
+        fill_from_spot_table(symbol, result)
+    except Exception:
+        return
 
 
 def get_latest_row(df):
@@ -135,32 +183,72 @@ def get_latest_row(df):
 
 
 def extract_metric(row: Dict[str, Any], keywords) -> Optional[float]:
+    """按列顺序返回首个命中关键字（不区分大小写）的有效值"""
     if not row:
         return None
-    for key, raw in row.items():
-        name = str(key)
-        lower_name = name.lower()
-        if any(k.lower() in lower_name for k in keywords):
+    pattern = keyword_pattern(keywords)
+    for name, raw in row.items():
+        if pattern.search(str(name)):
             val = safe_float(raw)
             if val is not None:
                 return val
     return None
 
 
-def extract_from_abstract(df, keywords: List[str]) -> Optional[float]:
+def abstract_date_columns(df) -> List[Any]:
+    """财务摘要的日期列（列名为 YYYYMMDD），按字符串逆序排列，最新在前"""
+    if df is None or df.empty:
+        return []
+    return sorted((c for c in df.columns if c not in ("选项", "指标")), key=str, reverse=True)
+
+
+# 利润表各指标候选关键字（不区分大小写的子串匹配）
+IS_METRIC_KEYWORDS: Dict[str, List[str]] = {
+    "revenue": ["营业总收入", "营业收入", "total_operate_income", "operate_income"],
+    "net_profit": ["净利润", "归母净利润", "归属于母公司所有者的净利润", "parent_netprofit", "netprofit"],
+    "operate_cost": ["营业成本", "operate_cost"],
+    "growth": ["parent_netprofit_yoy", "netprofit_yoy", "total_operate_income_yoy", "operate_income_yoy"],
+}
+
+
+def classify_metrics(row: Dict[str, Any], metric_keywords: Dict[str, List[str]]) -> Dict[str, float]:
+    """
+    单次遍历 row，记录每个指标按列顺序首个命中（不区分大小写）的有效值，
+    结果与对每个指标分别调用 extract_metric 一致。
+    """
+    found: Dict[str, float] = {}
+    if not row:
+        return found
+    patterns = [(metric, keyword_pattern(keywords)) for metric, keywords in metric_keywords.items()]
+    for name, raw in row.items():
+        matched = [metric for metric, pattern in patterns if metric not in found and pattern.search(str(name))]
+        if not matched:
+            continue
+        val = safe_float(raw)
+        if val is None:
+            continue
+        for metric in matched:
+            found[metric] = val
+    return found
+
+
+def extract_from_abstract(df, keywords: List[str], date_cols: Optional[List[Any]] = None) -> Optional[float]:
     """
     针对 stock_financial_abstract 的行转列结构，按指标行取最新列值。
+    date_cols 为 abstract_date_columns 的结果，多次提取时由调用方预先计算一次。
     """
     if df is None or df.empty:
         return None
     try:
-        candidates = df[df["指标"].astype(str).apply(lambda x: any(k.lower() in str(x).lower() for k in keywords))]
+        pattern = "|".join(re.escape(k) for k in keywords)
+        mask = df["指标"].astype(str).str.contains(pattern, case=False, regex=True, na=False)
+        candidates = df[mask]
         if candidates.empty:
             return None
         row = candidates.iloc[0].to_dict()
-        date_cols = [c for c in df.columns if c not in ("选项", "指标")]
-        # 列名是日期，按字符串逆序获取最新
-        for col in sorted(date_cols, reverse=True):
+        if date_cols is None:
+            date_cols = abstract_date_columns(df)
+        for col in date_cols:
             val = safe_float(row.get(col))
             if val is not None:
                 return val
@@ -194,13 +282,31 @@ def format_em_symbol(symbol: str) -> str:
     return f"sh{code}"
 
 
+_SESSION = None
+
+
+def get_http_session():
+    """懒加载共享 requests.Session，复用 keep-alive 连接"""
+    global _SESSION
+    if _SESSION is None:
+        import requests  # type: ignore
+        from requests.adapters import HTTPAdapter  # type: ignore
+
+        session = requests.Session()
+        session.headers.update({"User-Agent": "Mozilla/5.0"})
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        _SESSION = session
+    return _SESSION
+
+
 def fetch_quote_from_eastmoney(symbol: str) -> Optional[Dict[str, float]]:
     """
     直接调用东财行情接口获取市值/PE/PB（避免 akshare 代理问题）
     f162: 动态市盈率（乘以 100 后数值）; f167: 市净率（*100）; f116: 总市值（元）
+    返回 None 表示请求未拿到数据；拿到数据但字段均缺失时返回空字典。
     """
     try:
-        import requests  # type: ignore
+        session = get_http_session()
     except Exception:
         return None
 
@@ -212,10 +318,10 @@ def fetch_quote_from_eastmoney(symbol: str) -> Optional[Dict[str, float]]:
         "secid": secid,
         "fields": "f162,f167,f116",
     }
-    resp = requests.get(
+    resp = session.get(
         url,
         params=params,
-        headers={"User-Agent": "Mozilla/5.0", "Referer": "https://quote.eastmoney.com/"},
+        headers={"Referer": "https://quote.eastmoney.com/"},
         timeout=10,
     )
     data = resp.json().get("data") if resp is not None else None
@@ -231,15 +337,10 @@ def fetch_quote_from_eastmoney(symbol: str) -> Optional[Dict[str, float]]:
         quote["pb"] = pb_raw / 100 if abs(pb_raw) > 10 else pb_raw
     if mv is not None:
         quote["market_cap"] = mv
-    return quote if quote else None
+    return quote
 
 
-def main() -> None:
-    try:
-        payload = json.loads(sys.stdin.read() or "{}")
-    except Exception:
-        payload = {}
-
+def fetch_fundamentals(payload: Dict[str, Any]) -> Dict[str, Any]:
     symbol = str(payload.get("symbol") or "").strip()
     base_symbol = symbol[-6:]  # 假定输入 A 股 6 位代码
     em_symbol = format_em_symbol(base_symbol)
@@ -263,37 +364,70 @@ def main() -> None:
         "risk_level": "中等"
     }
     if not symbol:
-        print(json.dumps(result, ensure_ascii=False))
-        return
+        return result
 
     try:
         import akshare as ak  # type: ignore
     except Exception as e:
         result["error"] = f"akshare import failed: {e}"
-        print(json.dumps(result, ensure_ascii=False))
-        return
+        return result
 
     revenue_val: Optional[float] = None
 
     try:
-        df = ak.stock_financial_abstract(base_symbol)
-        bs = ak.stock_balance_sheet_by_report_em(em_symbol)
-        is_df = ak.stock_profit_sheet_by_report_em(em_symbol)
-        cf = ak.stock_cash_flow_sheet_by_report_em(em_symbol)
+        # 四张表互不依赖，并发拉取，总耗时约等于最慢的单次请求
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                "financial_abstract": executor.submit(
+                    get_or_fetch, "financial_abstract", base_symbol, TTL_STATEMENT,
+                    lambda: ak.stock_financial_abstract(base_symbol),
+                ),
+                "balance_sheet": executor.submit(
+                    get_or_fetch, "balance_sheet", em_symbol, TTL_STATEMENT,
+                    lambda: ak.stock_balance_sheet_by_report_em(em_symbol),
+                ),
+                "profit_sheet": executor.submit(
+                    get_or_fetch, "profit_sheet", em_symbol, TTL_STATEMENT,
+                    lambda: ak.stock_profit_sheet_by_report_em(em_symbol),
+                ),
+                "cash_flow_sheet": executor.submit(
+                    get_or_fetch, "cash_flow_sheet", em_symbol, TTL_STATEMENT,
+                    lambda: ak.stock_cash_flow_sheet_by_report_em(em_symbol),
+                ),
+            }
+        # 单张表失败不影响其余表，缺失的表按空处理
+        frames: Dict[str, Any] = {}
+        fetch_errors: List[str] = []
+        for name, future in futures.items():
+            try:
+                frames[name] = future.result()
+            except Exception as e:
+                frames[name] = None
+                fetch_errors.append(f"{name}: {e}")
+        if fetch_errors:
+            result["error"] = "akshare fetch failed: " + "; ".join(fetch_errors)
+
+        df = frames["financial_abstract"]
+        bs = frames["balance_sheet"]
+        is_df = frames["profit_sheet"]
+        cf = frames["cash_flow_sheet"]
 
         main_row = get_latest_row(df)
         bs_row = get_latest_row(bs)
         is_row = get_latest_row(is_df)
         # cf_row 暂未直接使用，如需现金流比率可扩展
         _ = get_latest_row(cf)
+        # 利润表指标单次遍历归类
+        is_metrics = classify_metrics(is_row, IS_METRIC_KEYWORDS)
 
         # 财务摘要（行转列）读取 ROE/ROA/毛利率/净利率等
-        roe_val = extract_from_abstract(df, ["净资产收益率", "roe"])
-        roa_val = extract_from_abstract(df, ["总资产报酬率", "roa"])
-        gross_margin_val = extract_from_abstract(df, ["毛利率"])
-        net_margin_val = extract_from_abstract(df, ["销售净利率", "净利率"])
-        market_cap_val = extract_from_abstract(df, ["总市值", "市值", "market_cap"])
-        growth_val = extract_from_abstract(df, ["净利润同比增长", "净利润同比增长率", "归母净利润同比增长"])
+        date_cols = abstract_date_columns(df)
+        roe_val = extract_from_abstract(df, ["净资产收益率", "roe"], date_cols)
+        roa_val = extract_from_abstract(df, ["总资产报酬率", "roa"], date_cols)
+        gross_margin_val = extract_from_abstract(df, ["毛利率"], date_cols)
+        net_margin_val = extract_from_abstract(df, ["销售净利率", "净利率"], date_cols)
+        market_cap_val = extract_from_abstract(df, ["总市值", "市值", "market_cap"], date_cols)
+        growth_val = extract_from_abstract(df, ["净利润同比增长", "净利润同比增长率", "归母净利润同比增长"], date_cols)
         pe_val = None
         pb_val = None
         pe_ttm_val = None
@@ -313,12 +447,12 @@ def main() -> None:
         )
 
         # PS = 市值 / 营收
-        revenue_val = extract_metric(is_row, ["营业总收入", "营业收入", "total_operate_income", "operate_income"])
+        revenue_val = is_metrics.get("revenue")
         ps_val = safe_div(market_cap_val, revenue_val)
 
         # ROE/ROA 若缺失，用财报推算
         if (roe_val is None or roa_val is None) and is_row:
-            net_profit = extract_metric(is_row, ["净利润", "归母净利润", "归属于母公司所有者的净利润", "parent_netprofit", "netprofit"])
+            net_profit = is_metrics.get("net_profit")
             if roe_val is None:
                 parent_equity = extract_metric(bs_row, ["股东权益合计", "归属于母公司股东权益合计", "total_parent_equity"])
                 roe_val = safe_div(net_profit, parent_equity)
@@ -331,20 +465,20 @@ def main() -> None:
 
         # 毛利率/净利率缺失时用利润表计算
         if gross_margin_val is None and is_row and revenue_val:
-            operate_cost = extract_metric(is_row, ["营业成本", "operate_cost"])
+            operate_cost = is_metrics.get("operate_cost")
             if operate_cost is not None:
                 gross_margin_val = safe_div(revenue_val - operate_cost, revenue_val)
                 if gross_margin_val is not None:
                     gross_margin_val = gross_margin_val * 100
         if net_margin_val is None and is_row and revenue_val:
-            net_profit = extract_metric(is_row, ["净利润", "归母净利润", "归属于母公司所有者的净利润", "parent_netprofit", "netprofit"])
+            net_profit = is_metrics.get("net_profit")
             net_margin_val = safe_div(net_profit, revenue_val)
             if net_margin_val is not None:
                 net_margin_val = net_margin_val * 100
 
         # 增长率优先用利润表同比（百分比）
         if growth_val is None and is_row:
-            growth_val = extract_metric(is_row, ["parent_netprofit_yoy", "netprofit_yoy", "total_operate_income_yoy", "operate_income_yoy"])
+            growth_val = is_metrics.get("growth")
             if growth_val is not None:
                 growth_val = growth_val / 100 if abs(growth_val) > 1 else growth_val
 
@@ -380,7 +514,7 @@ def main() -> None:
         # 保持兜底输出，不抛异常
         result["error"] = f"akshare fetch failed: {e}"
 
-    # 若仍缺关键字段，尝试从实时行情快照补齐
+    # 若仍缺关键字段，尝试从东财单只行情补齐
     if result.get("pe") == 0 or result.get("pb") == 0 or result.get("market_cap") == 0:
         try:
             fill_from_spot(base_symbol, result)
@@ -421,8 +555,15 @@ def main() -> None:
     else:
         risk_level = "低"
     result["risk_level"] = risk_level
+    return result
+
 
-    print(json.dumps(result, ensure_ascii=False))
+def main() -> None:
+    try:
+        payload = read_stdin()
+    except Exception:
+        payload = {}
+    emit(fetch_fundamentals(payload))
 
 
 if __name__ == "__main__":
@@ -1,86 +1,129 @@
 #!/usr/bin/env python3
 import sys
-import json
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
 
+from _jsonio import emit, read_stdin
 
-def main():
-    payload = json.load(sys.stdin)
-    symbol = str(payload.get("symbol", "")).strip()
+
+# akshare 中文列名 -> 输出字段（日期单独处理）
+COLUMN_MAP = {
+    "开盘": "open",
+    "最高": "high",
+    "最低": "low",
+    "收盘": "close",
+    "成交量": "vol",
+    "成交额": "amount",
+}
+NUM_COLS = ["open", "high", "low", "close", "pre_close", "change", "pct_chg", "vol", "amount"]
+
+
+class MarketDataError(Exception):
+    """行情拉取失败，消息原样写入 stderr"""
+
+
+def fetch_market_data(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    单只：{"symbol": "600519", ...} -> {"items": [...]}
+    批量：{"symbols": ["600519", ...], ...} -> {"items": {symbol: [...]}, "errors": {symbol: "..."}}
+    """
     start_date = str(payload.get("start_date", "")).strip()
     end_date = str(payload.get("end_date", "")).strip()
+    symbols = payload.get("symbols")
+
+    if isinstance(symbols, list):
+        symbols = [s for s in (str(x).strip() for x in symbols) if s]
+        if not symbols or not start_date or not end_date:
+            raise MarketDataError("参数缺失: symbols/start_date/end_date")
+        return fetch_batch(symbols, start_date, end_date)
 
+    symbol = str(payload.get("symbol", "")).strip()
     if not symbol or not start_date or not end_date:
-        sys.stderr.write("参数缺失: symbol/start_date/end_date\n")
-        sys.exit(1)
+        raise MarketDataError("参数缺失: symbol/start_date/end_date")
+    return {"items": fetch_history(symbol, start_date, end_date)}
+
 
+def fetch_batch(symbols: List[str], start_date: str, end_date: str) -> Dict[str, Any]:
+    """多只股票并发拉取，单只失败记录在 errors 中，不影响其余结果"""
+    symbols = list(dict.fromkeys(symbols))
+    items: Dict[str, List[Dict[str, Any]]] = {}
+    errors: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as executor:
+        futures = {sym: executor.submit(fetch_history, sym, start_date, end_date) for sym in symbols}
+    for sym, future in futures.items():
+        try:
+            items[sym] = future.result()
+        except Exception as e:
+            errors[sym] = str(e)
+    return {"items": items, "errors": errors}
+
+
+def fetch_history(symbol: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
     try:
         import akshare as ak
+        import numpy as np
+        import pandas as pd
     except Exception as e:
-        sys.stderr.write(f"导入 akshare 失败: {e}\n")
-        sys.exit(1)
+        raise MarketDataError(f"导入 akshare 失败: {e}")
 
     try:
         # akshare 需要 YYYYMMDD 格式
         df = ak.stock_zh_a_hist(symbol=symbol, start_date=start_date, end_date=end_date, adjust="qfq")
     except Exception as e:
-        sys.stderr.write(f"akshare 获取行情失败: {e}\n")
-        sys.exit(1)
+        raise MarketDataError(f"akshare 获取行情失败: {e}")
 
     if df is None or df.empty:
-        sys.stderr.write("akshare 返回空数据\n")
-        sys.exit(1)
+        raise MarketDataError("akshare 返回空数据")
 
-    # 标准化字段
-    df = df.rename(
-        columns={
-            "日期": "trade_date",
-            "开盘": "open",
-            "最高": "high",
-            "最低": "low",
-            "收盘": "close",
-            "成交量": "vol",
-            "成交额": "amount"
-        }
+    # 直接取出各列数组，排序与涨跌计算都在 numpy 上完成，不再生成中间 DataFrame
+    raw_dates = df["日期"].astype(str)
+    trade_date = (
+        pd.to_datetime(raw_dates, format="%Y-%m-%d", errors="coerce")
+        .dt.strftime("%Y%m%d")
+        .fillna(raw_dates)
+        .to_numpy(dtype=object)
     )
+    order = np.argsort(trade_date, kind="stable")
 
-    # 确保日期格式一致 YYYYMMDD
-    df["trade_date"] = df["trade_date"].apply(
-        lambda d: datetime.strptime(str(d), "%Y-%m-%d").strftime("%Y%m%d")
-        if isinstance(d, str) and "-" in d
-        else str(d)
-    )
+    size = len(df)
+    arrays: Dict[str, Any] = {}
+    for cn, en in COLUMN_MAP.items():
+        if cn in df.columns:
+            arrays[en] = df[cn].to_numpy(dtype=np.float64)[order]
+        elif en in ("vol", "amount"):
+            arrays[en] = np.zeros(size, dtype=np.float64)
+        else:
+            raise MarketDataError(f"akshare 返回缺少字段: {cn}")
 
-    df = df.sort_values("trade_date")
-    df["pre_close"] = df["close"].shift(1)
-    df["change"] = df["close"].diff()
-    df["pct_chg"] = df["change"] / df["pre_close"] * 100
-
-    items = []
-    for _, row in df.iterrows():
-        items.append(
-            {
-                "trade_date": str(row["trade_date"]),
-                "open": float(row["open"]),
-                "high": float(row["high"]),
-                "low": float(row["low"]),
-                "close": float(row["close"]),
-                "pre_close": float(row["pre_close"]) if not is_nan(row["pre_close"]) else None,
-                "change": float(row["change"]) if not is_nan(row["change"]) else None,
-                "pct_chg": float(row["pct_chg"]) if not is_nan(row["pct_chg"]) else None,
-                "vol": float(row["vol"]) if "vol" in row else 0.0,
-                "amount": float(row["amount"]) if "amount" in row else 0.0,
-            }
-        )
-
-    print(json.dumps({"items": items}, ensure_ascii=False))
-
-
-def is_nan(x):
+    close = arrays["close"]
+    pre_close = np.empty_like(close)
+    pre_close[0] = np.nan
+    pre_close[1:] = close[:-1]
+    change = close - pre_close
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_chg = change / pre_close * 100.0
+    arrays["pre_close"] = pre_close
+    arrays["change"] = change
+    arrays["pct_chg"] = pct_chg
+
+    # NaN 统一转为 None，按列处理后一次性拼成记录
+    columns = [trade_date[order].tolist()]
+    for key in NUM_COLS:
+        values = arrays[key].astype(object)
+        values[np.isnan(arrays[key])] = None
+        columns.append(values.tolist())
+    keys = ["trade_date"] + NUM_COLS
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def main():
+    payload = read_stdin()
     try:
-        return float(x) != float(x)
-    except Exception:
-        return True
+        data = fetch_market_data(payload)
+    except MarketDataError as e:
+        sys.stderr.write(f"{e}\n")
+        sys.exit(1)
+    emit(data)
 
 
 if __name__ == "__main__":
@@ -7,22 +7,35 @@
 注：若 akshare 调用失败或无数据，返回空列表，交由 Node 兜底。
 """
 
-import json
+import re
 import sys
 from typing import Any, Dict, List
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from _cache import TTL_NEWS, get_or_fetch
+from _jsonio import dumps, emit, loads, read_stdin
+
+# 复用 HTTP 连接（keep-alive），避免每次请求重新握手
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+_EM_RE = re.compile(r"</?em>")
 
 
 def main() -> None:
-    payload = _read_payload()
+    _emit(fetch_news(_read_payload()))
+
+
+def fetch_news(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     symbol = payload.get("symbol", "").strip()
     base_symbol = symbol[-6:]  # 仅保留 6 位代码
     max_news = int(payload.get("max_news", 10) or 10)
 
     if not base_symbol:
-        _emit([])
-        return
+        return []
 
     try:
         import akshare as ak  # type: ignore
@@ -46,11 +59,11 @@ def main() -> None:
             sys.stderr.write(f"东财 search-api 兜底失败: {e}\n")
             items = []
 
-    _emit(items)
+    return items
 
 
 def _fetch_by_akshare(ak, symbol: str, max_news: int) -> List[Dict[str, Any]]:
-    df = ak.stock_news_em(symbol=symbol)
+    df = get_or_fetch("stock_news_em", symbol, TTL_NEWS, lambda: ak.stock_news_em(symbol=symbol))
     if df is None or df.empty:
         return []
 
@@ -60,12 +73,26 @@ def _fetch_by_akshare(ak, symbol: str, max_news: int) -> List[Dict[str, Any]]:
         if c in df.columns:
             time_col = c
             break
+    # 只取前 max_news 条，nlargest 做部分排序，避免整表排序
     if time_col:
-        df = df.sort_values(by=time_col, ascending=False)
+        try:
+            df = df.nlargest(max_news, time_col)
+        except TypeError:
+            # 字符串类型的时间列不支持 nlargest，退回全量排序
+            df = df.sort_values(by=time_col, ascending=False).head(max_news)
+    else:
+        df = df.head(max_news)
+
+    # 只保留用到的列，一次性转为原生 dict 列表，循环内不再逐行装箱
+    wanted = [
+        "title", "art_title", "digest", "摘要", "source", "media_name", "来源",
+        "url", "content", "author", "summary", time_col,
+    ]
+    cols = [c for c in wanted if c and c in df.columns]
+    records = df[cols].to_dict("records")
 
     items: List[Dict[str, Any]] = []
-    for _, row in df.head(max_news).iterrows():
-        data = row.to_dict()
+    for data in records:
         title = str(
             data.get("title")
             or data.get("art_title")
@@ -114,12 +141,9 @@ def _fetch_by_http(symbol: str, max_news: int) -> List[Dict[str, Any]]:
             }
         },
     }
-    params = {"cb": "cb", "param": json.dumps(param_obj, ensure_ascii=False)}
-    headers = {
-        "User-Agent": "Mozilla/5.0",
-        "Referer": "https://so.eastmoney.com/",
-    }
-    resp = requests.get(
+    params = {"cb": "cb", "param": dumps(param_obj)}
+    headers = {"Referer": "https://so.eastmoney.com/"}
+    resp = _SESSION.get(
         "https://search-api-web.eastmoney.com/search/jsonp",
         params=params,
         headers=headers,
@@ -129,7 +153,7 @@ def _fetch_by_http(symbol: str, max_news: int) -> List[Dict[str, Any]]:
     if not text or "(" not in text or ")" not in text:
         return []
     json_str = text[text.find("(") + 1 : text.rfind(")")]
-    data = json.loads(json_str)
+    data = loads(json_str)
     articles = data.get("result", {}).get("cmsArticle", []) or []
 
     items: List[Dict[str, Any]] = []
@@ -157,7 +181,7 @@ def _fetch_by_http(symbol: str, max_news: int) -> List[Dict[str, Any]]:
 
 def _strip_em(text: str) -> str:
     """去掉东财返回中的 <em> 标记"""
-    return str(text).replace("<em>", "").replace("</em>", "").strip()
+    return _EM_RE.sub("", str(text)).strip()
 
 
 def _format_time(value: Any) -> str:
@@ -179,14 +203,14 @@ def _format_time(value: Any) -> str:
 
 def _read_payload() -> Dict[str, Any]:
     try:
-        return json.load(sys.stdin)
+        return read_stdin()
     except Exception as e:
         sys.stderr.write(f"读取输入失败: {e}\n")
         return {}
 
 
 def _emit(items: List[Dict[str, Any]]) -> None:
-    print(json.dumps({"items": items}, ensure_ascii=False))
+    emit({"items": items})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻 Python 进程，供 Node 复用，避免每次请求重复 import akshare/pandas。
+输入：stdin 每行一个 JSON {"id": 1, "op": "fundamentals" | "news" | "market", "args": {...}}
+输出：stdout 每行一个 JSON {"id": 1, "ok": true, "result": {...}} 或 {"id": 1, "ok": false, "error": "..."}
+线程开始执行某个请求时先回一行 {"id": 1, "started": true}，Node 据此从真正开始执行时计时。
+请求在线程池中并发处理（线程数取 TAS_WORKER_THREADS，默认 4），响应按完成顺序写回，由 id 对应。
+"""
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from _jsonio import dumps, loads
+
+import fetch_fundamentals
+import fetch_market_data
+import news_sync
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "fundamentals": fetch_fundamentals.fetch_fundamentals,
+    "news": lambda args: {"items": news_sync.fetch_news(args)},
+    "market": fetch_market_data.fetch_market_data,
+}
+
+# 协议输出独占真实 stdout；第三方库的 print 统一改写到 stderr，避免污染响应行
+_OUT = sys.stdout
+sys.stdout = sys.stderr
+_OUT_LOCK = threading.Lock()
+
+WORKER_THREADS = int(os.environ.get("TAS_WORKER_THREADS") or 4)
+
+
+def _respond(message: Dict[str, Any]) -> None:
+    try:
+        line = dumps(message)
+    except Exception as e:
+        # 结果无法序列化（如 pandas Timestamp）时也要回应，避免请求无声丢失
+        line = dumps({"id": message.get("id"), "ok": False, "error": f"结果序列化失败: {e}"})
+    with _OUT_LOCK:
+        _OUT.write(line + "\n")
+        _OUT.flush()
+
+
+def _handle(req: Dict[str, Any]) -> None:
+    req_id = req.get("id")
+    handler = HANDLERS.get(req.get("op"))
+    if handler is None:
+        _respond({"id": req_id, "ok": False, "error": f"未知操作: {req.get('op')}"})
+        return
+    _respond({"id": req_id, "started": True})
+    try:
+        result = handler(req.get("args") or {})
+    except Exception as e:
+        _respond({"id": req_id, "ok": False, "error": str(e)})
+        return
+    _respond({"id": req_id, "ok": True, "result": result})
+
+
+def main() -> None:
+    # 启动时预热重量级依赖，首个请求不再承担导入耗时
+    try:
+        import akshare  # type: ignore  # noqa: F401
+    except Exception as e:
+        sys.stderr.write(f"导入 akshare 失败: {e}\n")
+
+    with ThreadPoolExecutor(max_workers=WORKER_THREADS) as executor:
+        for line in sys.stdin.buffer:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                req = loads(line)
+            except Exception as e:
+                sys.stderr.write(f"解析请求失败: {e}\n")
+                continue
+            if not isinstance(req, dict):
+                continue
+            executor.submit(_handle, req)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ import {
   requestTushareTradeCal,
 } from "../clients/tushareClient";
 import { TUSHARE_TOKEN } from "../config/env";
-import { runPythonScript } from "../utils/pythonBridge";
+import { runPythonTask } from "../utils/pythonBridge";
 
 export interface FundamentalsData {
   pe: number;
@@ -232,7 +232,7 @@ async function resolveLatestTradeDate(targetDate: string): Promise<string> {
 }
 
 async function fetchByAkshare(symbol: string): Promise<FundamentalsData> {
-  const res = await runPythonScript<{
+  const res = await runPythonTask<{
     pe?: number;
     pe_ttm?: number;
     pb?: number;
@@ -251,7 +251,7 @@ async function fetchByAkshare(symbol: string): Promise<FundamentalsData> {
   growth_score?: number;
   risk_level?: string;
   error?: string;
-}>("fetch_fundamentals.py", {
+}>("fundamentals", {
   symbol,
 });
 
@@ -1,7 +1,7 @@
 import dayjs from 'dayjs';
 import { requestTushareDaily, requestTushareTradeCal } from '../clients/tushareClient';
 import { MARKET_ANALYST_LOOKBACK_DAYS, TUSHARE_TOKEN } from '../config/env';
-import { runPythonScript } from '../utils/pythonBridge';
+import { runPythonTask } from '../utils/pythonBridge';
 
 export interface MarketData {
   price: number;
@@ -195,7 +195,7 @@ async function fetchFromTushare(tsCode: string, startDate: string, endDate: stri
 
 async function fetchFromAkshare(symbol: string, startDate: string, endDate: string): Promise<DailyItem[]> {
   const payload = { symbol, start_date: startDate, end_date: endDate };
-  const response = await runPythonScript<{ items: DailyItem[] }>('fetch_market_data.py', payload);
+  const response = await runPythonTask<{ items: DailyItem[] }>('market', payload);
   if (!response?.items?.length) {
     throw new Error('Akshare 返回空数据');
   }
@@ -1,7 +1,7 @@
 import axios from "axios";
 import type { AxiosRequestConfig } from "axios";
 import { load } from "cheerio";
-import { runPythonScript } from "../utils/pythonBridge";
+import { runPythonTask } from "../utils/pythonBridge";
 
 export interface NewsItem {
   title: string;
@@ -45,7 +45,7 @@ async function fetchNewsByAkshare(
   maxNews: number
 ): Promise<NewsItem[]> {
   try {
-    const res = await runPythonScript<{
+    const res = await runPythonTask<{
       items: Array<{
         title?: string;
         impact?: string;
@@ -56,7 +56,7 @@ async function fetchNewsByAkshare(
         content?: string;
         author?: string;
       }>;
-    }>("news_sync.py", { symbol, max_news: maxNews });
+    }>("news", { symbol, max_news: maxNews });
     if (!res?.items?.length) return [];
     return res.items
       .map((raw) => ({
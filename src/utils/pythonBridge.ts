@@ -1,37 +1,150 @@
-import { spawn } from 'node:child_process';
+import { spawn, type ChildProcessByStdio } from 'node:child_process';
 import path from 'node:path';
+import readline from 'node:readline';
+import type { Readable, Writable } from 'node:stream';
 
-export async function runPythonScript<T = unknown>(scriptName: string, payload: any): Promise<T> {
-  const scriptPath = path.resolve(__dirname, '..', '..', 'py-bridge', scriptName);
-  return new Promise((resolve, reject) => {
-    const py = spawn('python3', [scriptPath], { stdio: ['pipe', 'pipe', 'inherit'] });
-    let stdout = '';
-
-    py.stdout.on('data', (chunk) => {
-      stdout += chunk.toString();
-    });
-
-    py.on('error', (err) => {
-      reject(new Error(`无法启动 Python 进程: ${err.message}`));
-    });
-
-    py.on('close', (code) => {
-      if (code === 0) {
-        try {
-          resolve(JSON.parse(stdout) as T);
-        } catch (e) {
-          reject(new Error(`解析 Python 输出失败: ${(e as Error).message}`));
-        }
-      } else {
-        reject(new Error(`Python 脚本退出码 ${code}`));
+type PythonOp = 'fundamentals' | 'news' | 'market';
+
+type WorkerProcess = ChildProcessByStdio<Writable, Readable, null>;
+
+interface PendingTask {
+  proc: WorkerProcess;
+  op: PythonOp;
+  timeoutMs: number;
+  // worker 线程真正开始执行（收到 started 回执）后才开始计时，排队时间不计入
+  timer?: NodeJS.Timeout;
+  resolve: (value: any) => void;
+  reject: (err: Error) => void;
+}
+
+// 与 worker.py 的线程池大小一致，通过 TAS_WORKER_THREADS 传给 Python
+const WORKER_THREADS = 4;
+
+// 单个任务的执行超时，需高于各脚本自身的最坏耗时：
+// 新闻 stock_news_em 无超时 + HTTP 兜底 timeout=15s；基本面需拉多张报表，冷缓存时更慢
+const TASK_TIMEOUT_MS: Record<PythonOp, number> = {
+  news: 60000,
+  market: 60000,
+  fundamentals: 120000
+};
+
+let worker: WorkerProcess | null = null;
+let nextTaskId = 1;
+const pendingTasks = new Map<number, PendingTask>();
+// 已超时但仍占用 worker 线程的任务，等其迟到的响应或进程退出时清理
+const stuckTasks = new Map<number, WorkerProcess>();
+
+// 只拒绝发给指定进程的任务，避免旧进程的迟到事件影响新 worker 上的任务
+function failPendingTasks(proc: WorkerProcess, err: Error) {
+  for (const [id, task] of pendingTasks) {
+    if (task.proc !== proc) continue;
+    pendingTasks.delete(id);
+    if (task.timer) clearTimeout(task.timer);
+    task.reject(err);
+  }
+  for (const [id, stuckProc] of stuckTasks) {
+    if (stuckProc === proc) stuckTasks.delete(id);
+  }
+}
+
+function countStuckTasks(proc: WorkerProcess): number {
+  let count = 0;
+  for (const stuckProc of stuckTasks.values()) {
+    if (stuckProc === proc) count++;
+  }
+  return count;
+}
+
+// 只拒绝超时的这一个任务；仅当所有线程都被超时任务占住时才判定 worker 卡死并重建
+function onTaskTimeout(id: number) {
+  const task = pendingTasks.get(id);
+  if (!task) return;
+  pendingTasks.delete(id);
+  stuckTasks.set(id, task.proc);
+  task.reject(new Error(`Python worker 任务超时 (${task.op}, ${task.timeoutMs}ms)`));
+
+  if (countStuckTasks(task.proc) >= WORKER_THREADS) {
+    if (worker === task.proc) worker = null;
+    task.proc.kill();
+  }
+}
+
+function ensureWorker(): WorkerProcess {
+  if (worker) return worker;
+
+  const workerPath = path.resolve(__dirname, '..', '..', 'py-bridge', 'worker.py');
+  const py = spawn('python3', [workerPath], {
+    stdio: ['pipe', 'pipe', 'inherit'],
+    env: { ...process.env, TAS_WORKER_THREADS: String(WORKER_THREADS) }
+  });
+
+  const rl = readline.createInterface({ input: py.stdout });
+  rl.on('line', (line) => {
+    if (!line.trim()) return;
+    let msg: { id?: number; started?: boolean; ok?: boolean; result?: unknown; error?: string };
+    try {
+      msg = JSON.parse(line);
+    } catch (e) {
+      console.error(`解析 Python worker 输出失败: ${(e as Error).message}`);
+      return;
+    }
+    if (msg.id === undefined) return;
+    const id = msg.id;
+    if (msg.started) {
+      const task = pendingTasks.get(id);
+      if (task && !task.timer) {
+        task.timer = setTimeout(() => onTaskTimeout(id), task.timeoutMs);
       }
-    });
+      return;
+    }
+    // 超时任务的迟到响应：线程已释放，调用方早已收到超时错误
+    if (stuckTasks.delete(id)) return;
+    const task = pendingTasks.get(id);
+    if (!task) return;
+    pendingTasks.delete(id);
+    if (task.timer) clearTimeout(task.timer);
+    if (msg.ok) {
+      task.resolve(msg.result);
+    } else {
+      task.reject(new Error(msg.error || 'Python worker 执行失败'));
+    }
+  });
+
+  // error 之后可能还会触发 exit，此时 worker 可能已被重建，只清理当前进程自身的状态
+  py.on('error', (err) => {
+    if (worker === py) worker = null;
+    failPendingTasks(py, new Error(`无法启动 Python worker: ${err.message}`));
+  });
+
+  py.on('exit', (code) => {
+    if (worker === py) worker = null;
+    failPendingTasks(py, new Error(`Python worker 退出码 ${code}`));
+  });
+
+  // worker 异常退出后写 stdin 会触发 EPIPE，交由 exit 事件统一处理
+  py.stdin.on('error', () => undefined);
+
+  worker = py;
+  return py;
+}
 
+/**
+ * 通过常驻 Python worker 执行任务，akshare 等依赖只在 worker 启动时导入一次。
+ */
+export async function runPythonTask<T = unknown>(
+  op: PythonOp,
+  args: any,
+  timeoutMs: number = TASK_TIMEOUT_MS[op]
+): Promise<T> {
+  const py = ensureWorker();
+  const id = nextTaskId++;
+  return new Promise<T>((resolve, reject) => {
+    pendingTasks.set(id, { proc: py, op, timeoutMs, resolve, reject });
     try {
-      py.stdin.write(JSON.stringify(payload));
-      py.stdin.end();
+      py.stdin.write(`${JSON.stringify({ id, op, args })}\n`);
     } catch (e) {
-      reject(new Error(`写入 Python stdin 失败: ${(e as Error).message}`));
+      pendingTasks.delete(id);
+      reject(new Error(`写入 Python worker stdin 失败: ${(e as Error).message}`));
     }
   });
 }